@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
-"""Export mesh data to JSON for the web viewer."""
+"""Export mesh data to JSON for the web viewer and to a compressed NPZ archive."""
 
+import base64
+import gzip
 import h5py
-import json
 import numpy as np
+import orjson
 from pathlib import Path
-import xml.etree.ElementTree as ET
+
+from mesh_series import cached_mirrored_triangles, h5_cache_opts, mirror_points, read_xdmf
 
 # Path to results
 output_dir = Path("/workspace/Examples/Cytokinesis/output")
@@ -14,29 +17,82 @@ h5_file = output_dir / "eighthsphere_results.h5"
 export_dir = Path("/workspace/mesh-viewer/public/data")
 export_dir.mkdir(parents=True, exist_ok=True)
 
-print(f"Reading mesh data from: {h5_file}")
+# Points are stored as int16 fixed-point (resolution ~6e-5 while |x| < 2; the
+# scale is lowered for shells that grow beyond)
+POINT_SCALE = 16384
+# gzip the binary blobs; the viewer inflates them with DecompressionStream
+COMPRESS_BLOBS = True
+
+
+def encode_array(arr, dtype, scale=None):
+    """Pack an array as a base64 blob the web viewer decodes into a typed array.
+
+    With ``scale``, values are stored as the integers ``rint(arr * scale)``;
+    the scale is lowered if the largest value would overflow ``dtype``.
+    """
+    if scale is not None:
+        peak = float(np.abs(arr).max(initial=0))
+        # Leave one unit of headroom for rounding
+        limit = np.iinfo(dtype).max - 1
+        if peak * scale > limit:
+            scale = limit / peak
+        arr = np.rint(arr * scale)
+    raw = np.ascontiguousarray(arr, dtype=dtype).tobytes()
+    if COMPRESS_BLOBS:
+        raw = gzip.compress(raw, mtime=0)
+    blob = {
+        'dtype': np.dtype(dtype).name,
+        'shape': list(arr.shape),
+        'compression': 'gzip' if COMPRESS_BLOBS else None,
+        'data': base64.b64encode(raw).decode('ascii')
+    }
+    if scale is not None:
+        blob['scale'] = scale
+    return blob
+
+
+def read_datasets(h5, paths, dtype):
+    """Read HDF5 datasets in bulk, one preallocated buffer of ``dtype`` per shape.
+
+    Datasets are visited in file order so the reads stream through the file.
+    Returns a dict mapping each path to its array (a view into the buffer).
+    """
+    datasets = sorted(((path, h5[path]) for path in set(paths)),
+                      key=lambda item: item[1].id.get_offset() or 0)
+    groups = {}
+    for path, ds in datasets:
+        groups.setdefault(ds.shape, []).append((path, ds))
+
+    arrays = {}
+    for shape, group in groups.items():
+        buf = np.empty((len(group),) + shape, dtype=dtype)
+        for j, (path, ds) in enumerate(group):
+            ds.read_direct(buf[j])
+            arrays[path] = buf[j]
+    return arrays
+
+
+def delta_encode(points):
+    """Delta-encode a (T, N, 3) series of points on a fixed mesh.
+
+    Positions are quantized with a per-axis scale (POINT_SCALE, lowered on an
+    axis whose positions or largest frame-to-frame step would overflow int16).
+    Returns the first frame, the (T - 1, N, 3) differences between frames,
+    both int16, and the scale; mesh_series.load_mesh_archive restores the
+    quantized positions exactly with a cumulative sum.
+    """
+    peak = np.abs(points).max(axis=(0, 1))
+    max_step = np.abs(np.diff(points, axis=0)).max(axis=(0, 1), initial=0)
+    # Leave one unit of headroom for rounding of the quantized positions
+    scale = np.minimum(POINT_SCALE, 32766 / np.maximum(np.maximum(peak, max_step), 1e-12))
+    quantized = np.rint(points * scale).astype(np.int32)
+    return quantized[0].astype(np.int16), np.diff(quantized, axis=0).astype(np.int16), scale
 
-# Parse XDMF to get time values and mesh indices
-tree = ET.parse(xdmf_file)
-root = tree.getroot()
 
-grids = [g for g in root.iter('Grid') if g.get('Name') == 'mesh']
+print(f"Reading mesh data from: {h5_file}")
 
-timesteps = []
-for grid in grids:
-    time_elem = grid.find('Time')
-    geom_elem = grid.find('.//Geometry/DataItem')
-    topo_elem = grid.find('.//Topology/DataItem')
-    
-    if time_elem is not None and geom_elem is not None:
-        t = float(time_elem.get('Value'))
-        geom_path = geom_elem.text.split(':')[1]
-        topo_path = topo_elem.text.split(':')[1]
-        timesteps.append({
-            'time': t,
-            'geometry_path': geom_path,
-            'topology_path': topo_path
-        })
+# Parse XDMF to get time values and mesh indices
+timesteps = read_xdmf(xdmf_file)
 
 print(f"Found {len(timesteps)} timesteps")
 
@@ -49,63 +105,108 @@ if len(timesteps) - 1 not in selected:
 
 print(f"Exporting {len(selected)} timesteps...")
 
-h5 = h5py.File(h5_file, 'r')
+h5 = h5py.File(h5_file, 'r', **h5_cache_opts(h5_file, timesteps[selected[0]]['geometry_path']))
+# float32/int32 halve the memory traffic of everything downstream; HDF5
+# converts while reading
+geometry = read_datasets(h5, [timesteps[idx]['geometry_path'] for idx in selected], np.float32)
+topology = read_datasets(h5, [timesteps[idx]['topology_path'] for idx in selected], np.int32)
+h5.close()
 
-mesh_data = {
-    'timesteps': [],
-    'metadata': {
-        'total_timesteps': len(timesteps),
-        'exported_timesteps': len(selected),
-        'time_range': [timesteps[0]['time'], timesteps[-1]['time']]
-    }
+metadata = {
+    'total_timesteps': len(timesteps),
+    'exported_timesteps': len(selected),
+    'time_range': [timesteps[0]['time'], timesteps[-1]['time']]
 }
 
-for i, idx in enumerate(selected):
-    ts = timesteps[idx]
-    t = ts['time']
-    
-    points = np.array(h5[ts['geometry_path']])
-    triangles = np.array(h5[ts['topology_path']])
-    
-    # Mirror to create full sphere (8 octants)
-    all_points = []
-    all_triangles = []
-    
-    signs = [
-        (1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1),
-        (-1, 1, 1), (-1, 1, -1), (-1, -1, 1), (-1, -1, -1)
-    ]
+# Runs of consecutive timesteps sharing the same mesh (the mesh only changes
+# on remeshing): the mirrored connectivity is built and encoded once per run,
+# and the archive stores it once
+segments = []
+prev_all_triangles = None
+
+# The viewer JSON is streamed one timestep at a time, so the encoded blobs of
+# past timesteps never pile up in memory
+json_path = export_dir / "mesh_data.json"
+with open(json_path, 'wb') as f:
+    f.write(b'{"metadata":' + orjson.dumps(metadata) + b',"timesteps":[')
     
-    for sx, sy, sz in signs:
-        offset = len(all_points)
-        reflected = points.copy()
-        reflected[:, 0] *= sx
-        reflected[:, 1] *= sy
-        reflected[:, 2] *= sz
-        all_points.extend(reflected.tolist())
+    for i, idx in enumerate(selected):
+        ts = timesteps[idx]
+        t = ts['time']
         
-        for tri in triangles:
-            if sx * sy * sz > 0:
-                all_triangles.append([int(tri[0] + offset), int(tri[1] + offset), int(tri[2] + offset)])
-            else:
-                all_triangles.append([int(tri[0] + offset), int(tri[2] + offset), int(tri[1] + offset)])
-    
-    mesh_data['timesteps'].append({
-        'index': i,
-        'time': round(t, 3),
-        'points': all_points,
-        'triangles': all_triangles
-    })
+        points = geometry[ts['geometry_path']]
+        triangles = topology[ts['topology_path']]
+        
+        # Mirror to create full sphere (8 octants)
+        all_points = mirror_points(points)
+        
+        # A new table is only returned when the mesh changed
+        all_triangles = cached_mirrored_triangles(triangles, len(points))
+        if all_triangles is not prev_all_triangles:
+            triangles_blob = encode_array(all_triangles, '<i4')
+            segments.append({'start': i, 'triangles': triangles, 'points': []})
+            prev_all_triangles = all_triangles
+        segments[-1]['points'].append(points)
+        
+        if i > 0:
+            f.write(b',')
+        f.write(orjson.dumps({
+            'index': i,
+            'time': round(t, 3),
+            'points': encode_array(all_points, '<i2', scale=POINT_SCALE),
+            'triangles': triangles_blob
+        }))
+        
+        print(f"  {i+1}/{len(selected)}: t={t:.2f}s ({len(all_points)} pts)")
     
-    print(f"  {i+1}/{len(selected)}: t={t:.2f}s ({len(all_points)} pts)")
-
-h5.close()
-
-# Save to JSON
-json_path = export_dir / "mesh_data.json"
-with open(json_path, 'w') as f:
-    json.dump(mesh_data, f)
+    f.write(b']}')
+
+# Save binary archive: per segment, the (T, N, 3) points and a single (M, 3)
+# int32 connectivity table. The mesh moves smoothly between timesteps, so the
+# points of multi-timestep segments are delta-encoded: the small int16 deltas
+# compress far better than positions. Single timesteps (every segment when the
+# simulation remeshes more often than the export stride) stay float16.
+# Only the simulated eighth-sphere is stored; readers mirror it with
+# mirror_points and build_mirrored_triangles.
+archive = {
+    'times': np.array([timesteps[idx]['time'] for idx in selected]),
+    'segment_start': np.array([seg['start'] for seg in segments], dtype=np.int32)
+}
+for k, seg in enumerate(segments):
+    if len(seg['points']) > 1:
+        seg['encoding'] = 'delta'
+        archive[f'p0_{k}'], archive[f'deltas_{k}'], archive[f'scale_{k}'] = delta_encode(np.stack(seg['points']))
+    else:
+        seg['encoding'] = 'plain'
+        archive[f'points_{k}'] = np.stack(seg['points']).astype(np.float16)
+    archive[f'triangles_{k}'] = seg['triangles']
+
+archive_path = export_dir / "mesh_data.npz"
+np.savez_compressed(archive_path, **archive)
+
+manifest = {
+    'archive': archive_path.name,
+    'metadata': metadata,
+    'symmetry': 'eighth_sphere',
+    'segments': [
+        {
+            'start': seg['start'],
+            'n_timesteps': len(seg['points']),
+            'points_encoding': seg['encoding'],
+            'points_shape': [len(seg['points'])] + list(seg['points'][0].shape),
+            'points_dtype': 'int16' if seg['encoding'] == 'delta' else 'float16',
+            'scale': archive[f'scale_{k}'].tolist() if seg['encoding'] == 'delta' else None,
+            'triangles_shape': list(archive[f'triangles_{k}'].shape),
+            'triangles_dtype': 'int32'
+        }
+        for k, seg in enumerate(segments)
+    ]
+}
+manifest_path = export_dir / "manifest.json"
+manifest_path.write_bytes(orjson.dumps(manifest))
 
 print(f"\nExported to: {json_path}")
 print(f"File size: {json_path.stat().st_size / 1024 / 1024:.1f} MB")
+print(f"Archive: {archive_path} ({archive_path.stat().st_size / 1024 / 1024:.1f} MB, "
+      f"{len(segments)} mesh segments)")
 
@@ -4,22 +4,7 @@ import { useRef, useMemo } from 'react'
 import { Canvas } from '@react-three/fiber'
 import { OrbitControls } from '@react-three/drei'
 import * as THREE from 'three'
-
-interface TimestepData {
-    index: number
-    time: number
-    points: number[][]
-    triangles: number[][]
-}
-
-interface MeshData {
-    timesteps: TimestepData[]
-    metadata: {
-        total_timesteps: number
-        exported_timesteps: number
-        time_range: [number, number]
-    }
-}
+import type { MeshData, TimestepData } from '../lib/meshData'
 
 function CellMesh({
     timestep,
@@ -33,35 +18,25 @@ function CellMesh({
     const geometry = useMemo(() => {
         const geom = new THREE.BufferGeometry()
 
-        // Flatten points array
-        const posArray: number[] = []
-        for (const p of timestep.points) {
-            posArray.push(p[0], p[1], p[2])
-        }
-        const positions = new Float32Array(posArray)
-        geom.setAttribute('position', new THREE.BufferAttribute(positions, 3))
-
-        // Flatten triangles array
-        const idxArray: number[] = []
-        for (const t of timestep.triangles) {
-            idxArray.push(t[0], t[1], t[2])
-        }
-        const indices = new Uint32Array(idxArray)
-        geom.setIndex(new THREE.BufferAttribute(indices, 1))
+        const points = timestep.points
+        geom.setAttribute('position', new THREE.BufferAttribute(points, 3))
+        geom.setIndex(new THREE.BufferAttribute(timestep.triangles, 1))
 
         geom.computeVertexNormals()
 
         // Compute colors based on z-coordinate
-        const colors = new Float32Array(timestep.points.length * 3)
+        const nPoints = points.length / 3
+        const colors = new Float32Array(points.length)
         let zMin = Infinity, zMax = -Infinity
-        for (const p of timestep.points) {
-            if (p[2] < zMin) zMin = p[2]
-            if (p[2] > zMax) zMax = p[2]
+        for (let i = 0; i < nPoints; i++) {
+            const z = points[i * 3 + 2]
+            if (z < zMin) zMin = z
+            if (z > zMax) zMax = z
         }
         const zRange = zMax - zMin || 1
 
-        timestep.points.forEach((point, i) => {
-            const t = (point[2] - zMin) / zRange
+        for (let i = 0; i < nPoints; i++) {
+            const t = (points[i * 3 + 2] - zMin) / zRange
 
             if (colorMode === 'height') {
                 // Blue to red colormap
@@ -70,7 +45,7 @@ function CellMesh({
                 colors[i * 3 + 2] = (1 - t) * 0.9 + 0.1
             } else if (colorMode === 'curvature') {
                 // Distance from center
-                const r = Math.sqrt(point[0] ** 2 + point[1] ** 2)
+                const r = Math.sqrt(points[i * 3] ** 2 + points[i * 3 + 1] ** 2)
                 const rNorm = Math.min(r / 1.2, 1)
                 colors[i * 3] = 0.2 + rNorm * 0.7
                 colors[i * 3 + 1] = 0.8 - rNorm * 0.5
@@ -81,7 +56,7 @@ function CellMesh({
                 colors[i * 3 + 1] = 0.7
                 colors[i * 3 + 2] = 0.9
             }
-        })
+        }
 
         geom.setAttribute('color', new THREE.BufferAttribute(colors, 3))
 
@@ -103,17 +78,8 @@ function CellMesh({
 function WireframeMesh({ timestep }: { timestep: TimestepData }) {
     const geometry = useMemo(() => {
         const geom = new THREE.BufferGeometry()
-        const posArray: number[] = []
-        for (const p of timestep.points) {
-            posArray.push(p[0], p[1], p[2])
-        }
-        geom.setAttribute('position', new THREE.BufferAttribute(new Float32Array(posArray), 3))
-
-        const idxArray: number[] = []
-        for (const t of timestep.triangles) {
-            idxArray.push(t[0], t[1], t[2])
-        }
-        geom.setIndex(new THREE.BufferAttribute(new Uint32Array(idxArray), 1))
+        geom.setAttribute('position', new THREE.BufferAttribute(timestep.points, 3))
+        geom.setIndex(new THREE.BufferAttribute(timestep.triangles, 1))
         return geom
     }, [timestep])
 
@@ -0,0 +1,82 @@
+// Decoding of the binary blobs written by export_mesh_data.py
+
+interface EncodedArray {
+    dtype: 'int16' | 'int32'
+    shape: number[]
+    compression: 'gzip' | null
+    scale?: number
+    data: string
+}
+
+interface EncodedTimestep {
+    index: number
+    time: number
+    points: EncodedArray
+    triangles: EncodedArray
+}
+
+export interface TimestepData {
+    index: number
+    time: number
+    // Flat xyz coordinates
+    points: Float32Array
+    // Flat vertex indices, three per triangle
+    triangles: Uint32Array
+}
+
+export interface MeshMetadata {
+    total_timesteps: number
+    exported_timesteps: number
+    time_range: [number, number]
+}
+
+export interface EncodedMeshData {
+    timesteps: EncodedTimestep[]
+    metadata: MeshMetadata
+}
+
+export interface MeshData {
+    timesteps: TimestepData[]
+    metadata: MeshMetadata
+}
+
+async function decodeBytes(blob: EncodedArray): Promise<ArrayBuffer> {
+    const binary = atob(blob.data)
+    const bytes = new Uint8Array(binary.length)
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i)
+    }
+
+    let stream: ReadableStream<Uint8Array> = new Blob([bytes]).stream()
+    if (blob.compression === 'gzip') {
+        stream = stream.pipeThrough(new DecompressionStream('gzip'))
+    }
+    return new Response(stream).arrayBuffer()
+}
+
+async function decodePoints(blob: EncodedArray): Promise<Float32Array> {
+    const quantized = new Int16Array(await decodeBytes(blob))
+    const invScale = 1 / (blob.scale ?? 1)
+    const points = new Float32Array(quantized.length)
+    for (let i = 0; i < quantized.length; i++) {
+        points[i] = quantized[i] * invScale
+    }
+    return points
+}
+
+async function decodeTriangles(blob: EncodedArray): Promise<Uint32Array> {
+    // Indices are non-negative, so the int32 bytes read as uint32 unchanged
+    return new Uint32Array(await decodeBytes(blob))
+}
+
+export async function decodeMeshData(raw: EncodedMeshData): Promise<MeshData> {
+    const timesteps = await Promise.all(
+        raw.timesteps.map(async ts => ({
+            index: ts.index,
+            time: ts.time,
+            points: await decodePoints(ts.points),
+            triangles: await decodeTriangles(ts.triangles)
+        }))
+    )
+    return { timesteps, metadata: raw.metadata }
+}
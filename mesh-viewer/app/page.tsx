@@ -3,6 +3,7 @@
 import { useState, useEffect, useCallback, Suspense } from 'react'
 import dynamic from 'next/dynamic'
 import Controls from './components/Controls'
+import { decodeMeshData, type MeshData } from './lib/meshData'
 
 // Dynamic import to avoid SSR issues with Three.js
 const MeshViewer = dynamic(() => import('./components/MeshViewer'), {
@@ -17,20 +18,6 @@ const MeshViewer = dynamic(() => import('./components/MeshViewer'), {
   )
 })
 
-interface MeshData {
-  timesteps: Array<{
-    index: number
-    time: number
-    points: number[][]
-    triangles: number[][]
-  }>
-  metadata: {
-    total_timesteps: number
-    exported_timesteps: number
-    time_range: [number, number]
-  }
-}
-
 function LoadingScreen({ progress }: { progress: number }) {
   return (
     <div className="min-h-screen bg-gradient-to-b from-slate-900 via-slate-950 to-black flex items-center justify-center">
@@ -113,11 +100,11 @@ export default function Home() {
           const text = new TextDecoder().decode(allChunks)
           setLoadProgress(95)
           
-          const meshData = JSON.parse(text)
+          const meshData = await decodeMeshData(JSON.parse(text))
           setData(meshData)
         } else {
           // Fallback for browsers that don't support streaming
-          const meshData = await response.json()
+          const meshData = await decodeMeshData(await response.json())
           setData(meshData)
         }
         